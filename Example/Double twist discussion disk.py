@@ -1,31 +1,47 @@
+import asyncio
 import serial
-import time
 
-def send_serial_data(port, baudrate):
-    try:
-        ser = serial.Serial(port, baudrate, timeout=1)
-        data_sequence = [
-            b'\xAA\x01\xC2\x00\x00\x00',
-            b'\xAA\x02\xC2\x00\x00\x00',
-            b'\xAA\x01\xC2\x00\x55\x15',
-            b'\xAA\x02\xC2\x00\x55\x15',
-            b'\xAA\x01\xC2\x00\xAB\x2A',
-            b'\xAA\x02\xC2\x00\xAB\x2A'
-        ]
+try:
+    # Windows下pyserial-asyncio-fast避免了内部的阻塞轮询
+    import serial_asyncio_fast as serial_asyncio
+except ImportError:
+    import serial_asyncio
 
-        while True:
-            for data in data_sequence:
-                ser.write(data)
-                print(f"Sent: {data.hex().upper()}")
-                time.sleep(0.12)
 
+async def send_serial_data(port, baudrate, data_sequence, interval=0.12):
+    try:
+        _, writer = await serial_asyncio.open_serial_connection(url=port, baudrate=baudrate)
     except serial.SerialException as e:
         print(f"Error: {e}")
+        return
+
+    try:
+        while True:
+            for data in data_sequence:
+                writer.write(data)
+                print(f"{port} Sent: {data.hex().upper()}")
+                await asyncio.sleep(interval)
     finally:
-        ser.close()
+        writer.close()
+
+
+async def main(port_sequences, baudrate):
+    # 每个串口一个发送协程，共用同一个事件循环
+    await asyncio.gather(*(send_serial_data(port, baudrate, sequence)
+                           for port, sequence in port_sequences.items()))
+
 
 if __name__ == "__main__":
-    serial_port = 'COM16' 
+    serial_port = 'COM16'
     baud_rate = 115200
+    data_sequence = [
+        b'\xAA\x01\xC2\x00\x00\x00',
+        b'\xAA\x02\xC2\x00\x00\x00',
+        b'\xAA\x01\xC2\x00\x55\x15',
+        b'\xAA\x02\xC2\x00\x55\x15',
+        b'\xAA\x01\xC2\x00\xAB\x2A',
+        b'\xAA\x02\xC2\x00\xAB\x2A'
+    ]
 
-    send_serial_data(serial_port, baud_rate)
+    # 电机分布在多个串口时在此追加，例如 'COM17': [...]
+    asyncio.run(main({serial_port: data_sequence}, baud_rate))
@@ -1,7 +1,121 @@
+import argparse
+import collections
+import sys
+import threading
 import time
+from functools import lru_cache
+import numpy as np
 import serial
 import struct
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+# 位置应答负载: uint16位置 + int16速度 + uint16电流 (小端)
+_POS_STRUCT = struct.Struct('<HhH')
+_POS_UNPACK = _POS_STRUCT.unpack_from
+# 命令帧: AA [ID] 命令位 回报长度 + uint16参数 (小端)，负数按补码取低16位
+_CMD_STRUCT = struct.Struct('<BBBBH')
+_PARAM_STRUCT = struct.Struct('<H')
+
+# 高频路径上的日志先进入环形缓冲，由后台线程每秒统一输出
+_LOG = collections.deque(maxlen=1024)
+# 取出与写出在同一把锁内完成，后台线程与主线程的输出不会交错乱序
+_LOG_LOCK = threading.Lock()
+
+
+def _log(message: str, *args):
+    """
+    记录一条延迟输出的日志
+    带args时message为str.format模板，到输出时才格式化
+    """
+    _LOG.append((message, args))
+
+
+def _flush_log():
+    """
+    立即输出缓冲中的日志，交互提示和阶段性输出前调用以保持顺序
+    """
+    with _LOG_LOCK:
+        lines = []
+        while True:
+            try:
+                message, args = _LOG.popleft()
+                lines.append(message.format(*args) if args else message)
+            except IndexError:
+                break
+        if lines:
+            sys.stdout.write('\n'.join(lines) + '\n')
+            sys.stdout.flush()
+
+
+def _log_flusher():
+    while True:
+        time.sleep(1)
+        _flush_log()
+
+
+_LOG_THREAD = threading.Thread(target=_log_flusher, daemon=True)
+
+
+@lru_cache(maxsize=256)
+def _hex2(value: int) -> str:
+    """
+    单字节值的十六进制显示 (0xNN)
+    """
+    return f'0x{value:02X}'
+
+
+def _speed_stats(speeds: np.ndarray) -> Tuple[float, float]:
+    """
+    计算速度样本的平均值和标准差，无样本时返回(0, 0)
+    """
+    if not len(speeds):
+        _log("平均速度: 0.00, 采样点数: 0")
+        return 0.0, 0.0
+    average_speed = float(speeds.mean())
+    speed_std = float(speeds.std())
+    _log("平均速度: {:.2f}, 标准差: {:.2f}, 采样点数: {}", average_speed, speed_std, len(speeds))
+    return average_speed, speed_std
+
+# 自动探测时从高到低尝试的波特率，固件默认115200
+BAUDRATE_CANDIDATES = (921600, 460800, 230400, 115200)
+
+# 采样间隔小于该值时忙等，避免Windows下sleep精度不足
+_SPIN_INTERVAL = 0.002
+
+# 相邻两帧命令之间的最小空闲时间。固件按USART空闲线断帧，
+# 连续发送的帧会并入同一个6字节DMA缓冲，只有第一帧被执行
+_FRAME_GAP = 0.002
+
+# 0电角度搜索步长: 步长 = 增益 * 速度差值，叠加动量后限幅
+_STEP_GAIN = 0.4
+_STEP_MOMENTUM = 0.7
+_STEP_MAX = 25
+
+# 等待电机稳定/停止时的速度判据 (编码器计数/控制周期)
+_STOP_SPEED = 2
+_STABLE_TOLERANCE = 3
+_STABLE_READINGS = 4
+
+# 各阶段的最长等待时间(秒)，spinup/stop阶段满足速度判据时提前结束
+PHASE_WAITS = {
+    'align': 1.0,       # 0B电压矢量把转子拉到粗0位
+    'spinup': 1.0,      # 设定转速后等待转速稳定
+    'stop': 1.0,        # 停机后等待电机停止
+    'iteration': 0.05,  # 写入新的0电角度位置后
+}
+
+
+def _wait_until(deadline: float, spin: bool = False):
+    """
+    等待到perf_counter时间点deadline，已超时则立即返回
+    """
+    if spin:
+        while time.perf_counter() < deadline:
+            pass
+        return
+    slack = deadline - time.perf_counter()
+    if slack > 0:
+        time.sleep(slack)
 
 
 class MotorController:
@@ -9,9 +123,18 @@ class MotorController:
         """
         初始化电机控制器
         """
-        self.ser = serial.Serial(port, baudrate, timeout=1)
+        # 7字节应答在115200下约0.6ms，20ms超时只在丢包时才会用满
+        self.ser = serial.Serial(port, baudrate, timeout=0.02, write_timeout=0.02,
+                                 inter_byte_timeout=None)
+        self._last_write = 0.0  # 上一帧发送完成的perf_counter时间
         self.current_zero_position = 0  # 当前0电角度位置
         self.motor_id = 0x01  # 默认电机ID
+        self._build_command_templates()
+        if not _LOG_THREAD.is_alive():
+            _LOG_THREAD.start()
+        # 固件是否能连续应答多条读取命令；当前固件的IDLE分帧会合并连续写入的帧，
+        # 只在固件支持时手动置True启用批量读取
+        self.batch_supported = False
 
     def set_motor_id(self, new_id: int):
         """
@@ -20,21 +143,69 @@ class MotorController:
         if new_id < 0 or new_id > 255:
             raise ValueError("电机ID必须在0-255范围内")
         self.motor_id = new_id
-        print(f"电机ID设置为: 0x{new_id:02X}")
+        self._build_command_templates()
+        print(f"电机ID设置为: {_hex2(new_id)}")
 
-    def send_command(self, command: bytes) -> bytes:
+    def _build_command_templates(self):
         """
-        发送命令并接收响应
-        命令格式: AA 01 命令位 00 参数低8位 参数高8位
+        按当前电机ID生成常用命令模板，带参数的命令在发送前原地改写参数字节
+        """
+        self._cmd_read = bytes([0xAA, self.motor_id, 0x08, 0x07, 0x00, 0x00])
+        self._cmd_stop = bytes([0xAA, self.motor_id, 0xC0, 0x00, 0x00, 0x00])
+        self._cmd_speed = bytearray([0xAA, self.motor_id, 0xC0, 0x00, 0x00, 0x00])
+        self._cmd_zero = bytearray([0xAA, self.motor_id, 0xF1, 0x00, 0x00, 0x00])
+
+    def _write_frame(self, command: bytes):
+        """
+        发送命令帧，保证与上一帧之间至少间隔_FRAME_GAP
+        flush等待数据离开发送缓冲后才记录发送时间
         """
+        _wait_until(self._last_write + _FRAME_GAP, spin=True)
         self.ser.write(command)
-        time.sleep(0.01)
-        temp = self.ser.read_all()
-        if temp:
+        self.ser.flush()
+        self._last_write = time.perf_counter()
+
+    def send_command(self, command: bytes, resp_len: Optional[int] = None) -> bytes:
+        """
+        发送命令并接收响应
+        命令格式: AA 01 命令位 回报长度 参数低8位 参数高8位
+        resp_len: 应答字节数，默认取命令中的回报长度；为0时不等待应答
+        固件只在回报长度非0时应答，收满应答字节即返回，不再固定等待
+        """
+        if resp_len is None:
+            resp_len = command[3]
+        self.ser.reset_input_buffer()
+        self._write_frame(command)
+        if not resp_len:
+            return b''
+        temp = self.ser.read(resp_len)
+        if len(temp) == resp_len:
             return temp
         else:
             raise Exception("未收到响应")
 
+    def send_command_nowait(self, command: bytes):
+        """
+        只发送不等待应答，用于不回报数据的设置类命令
+        """
+        self._write_frame(command)
+
+    def probe_baudrate(self, candidates=BAUDRATE_CANDIDATES) -> int:
+        """
+        从高到低尝试波特率，以读取命令收到完整AB应答为准
+        固件USART波特率需同步提高，否则会回落到115200
+        """
+        for baudrate in candidates:
+            self.ser.baudrate = baudrate
+            try:
+                response = self.send_command(self._cmd_read, resp_len=7)
+            except Exception:
+                continue
+            if response[0] == 0xAB:
+                print(f"串口波特率: {baudrate}")
+                return baudrate
+        raise Exception("所有波特率均未收到响应")
+
     def set_coarse_zero_position(self):
         """
         使用0B命令拉高IA，得到粗0位
@@ -42,7 +213,7 @@ class MotorController:
         """
         command = bytes([0xAA, self.motor_id, 0x0B, 0x00, 0x00, 0x00])
         response = self.send_command(command)
-        time.sleep(1)
+        self.wait_phase('align')
         _, _, position = self.read_position_data()
         self.set_zero_position(position)
         self.stop_motor()
@@ -55,20 +226,29 @@ class MotorController:
         命令: AA [ID] 00 07 00 00
         返回: (位置, 速度, 电流)
         """
-        command = bytes([0xAA, self.motor_id, 0x08, 0x07, 0x00, 0x00])
-        response = self.send_command(command)
-
-        if len(response) >= 7:
-            # 解析7字节数据: AB + uint16位置 + int16速度 + uint16电流
-            # 响应格式: AB [位置低8位] [位置高8位] [速度低8位] [速度高8位] [电流低8位] [电流高8位]
-            position = struct.unpack('<H', response[1:3])[0]  # uint16 小端
-            position = 0x3fff - position
-            speed = struct.unpack('<h', response[3:5])[0]  # int16 小端
-            current = struct.unpack('<H', response[5:7])[0]  # uint16 小端
-            return position, speed, current
-        else:
-            print(f"读取数据失败，响应长度: {len(response)}")
-            return 0, 0, 0
+        self.ser.reset_input_buffer()
+        self._write_frame(self._cmd_read)
+        # 响应格式: AB [位置低8位] [位置高8位] [速度低8位] [速度高8位] [电流低8位] [电流高8位]
+        payload = self._read_frame()
+        position, speed, current = _POS_UNPACK(payload, 0)
+        position = 0x3fff - position
+        return position, speed, current
+
+    def _read_frame(self, expected_header: int = 0xAB, payload_len: int = 6) -> bytes:
+        """
+        在接收流中查找帧头，返回其后payload_len字节的负载
+        帧头之前的多余字节被丢弃，超时未收到完整帧时抛出异常
+        """
+        while True:
+            header = self.ser.read(1)
+            if not header:
+                raise Exception("未收到响应")
+            if header[0] == expected_header:
+                break
+        payload = self.ser.read(payload_len)
+        if len(payload) < payload_len:
+            raise Exception("未收到响应")
+        return payload
 
     def set_zero_position(self, zero_pos: int):
         """
@@ -76,52 +256,35 @@ class MotorController:
         命令: AA [ID] F1 00 [位置低8位] [位置高8位]
         """
         self.current_zero_position = zero_pos
-        low_byte = zero_pos & 0xFF
-        high_byte = (zero_pos >> 8) & 0xFF
-        command = bytes([0xAA, self.motor_id, 0xF1, 0x00, low_byte, high_byte])
-        response = self.send_command(command)
-        print(f"设置0电角度位置: {zero_pos} (0x{zero_pos:04X})")
-        return response
+        _PARAM_STRUCT.pack_into(self._cmd_zero, 4, zero_pos & 0xFFFF)
+        self.send_command_nowait(self._cmd_zero)
+        _log("设置0电角度位置: {0} (0x{0:04X})", zero_pos)
 
     def clear_motor_status(self):
         """
-        C1命令清除电机状态
-        命令: AA [ID] C1 00 00 00
+        C0命令清除电机状态 (转矩置0，与stop_motor相同的帧)
+        命令: AA [ID] C0 00 00 00
+        固件中C1为速度模式指令，不能用于清除状态
         """
-        command = bytes([0xAA, self.motor_id, 0xC0, 0x00, 0x00, 0x00])
-        response = self.send_command(command)
+        self.send_command_nowait(self._cmd_stop)
         print("清除电机状态完成")
-        return response
 
     def set_motor_speed(self, speed: int):
         """
         C0命令控制电机转速
         命令: AA [ID] C0 00 [速度低8位] [速度高8位]
         """
-        # 处理负数速度（16位有符号转无符号）
-        if speed < 0:
-            speed = 0x10000 + speed  # 补码表示
-
-        low_byte = speed & 0xFF
-        high_byte = (speed >> 8) & 0xFF
-
-        command = bytes([0xAA, self.motor_id, 0xC0, 0x00, low_byte, high_byte])
-        response = self.send_command(command)
-
-        # 显示实际设置的速度值（有符号）
-        actual_speed = speed if speed < 0x8000 else speed - 0x10000
-        print(f"设置电机转速: {actual_speed}")
-        return response
+        _PARAM_STRUCT.pack_into(self._cmd_speed, 4, speed & 0xFFFF)
+        self.send_command_nowait(self._cmd_speed)
+        _log("设置电机转速: {}", speed)
 
     def stop_motor(self):
         """
         C0命令停止电机
         命令: AA [ID] C0 00 00 00
         """
-        command = bytes([0xAA, self.motor_id, 0xC0, 0x00, 0x00, 0x00])
-        response = self.send_command(command)
-        print("停止电机")
-        return response
+        self.send_command_nowait(self._cmd_stop)
+        _log("停止电机")
 
     def save_conf(self):
         """
@@ -129,9 +292,8 @@ class MotorController:
         命令: AA [ID] B0 00 00 00
         """
         command = bytes([0xAA, self.motor_id, 0xB0, 0x00, 0x00, 0x00])
-        response = self.send_command(command)
+        self.send_command_nowait(command)
         print("正在保存设置")
-        return response
 
     def set_new_motor_id(self, new_id: int):
         """
@@ -142,110 +304,201 @@ class MotorController:
             raise ValueError("电机ID必须在0-255范围内")
 
         command = bytes([0xAA, self.motor_id, 0xF0, 0x00, new_id, 0x00])
-        response = self.send_command(command)
-        print(f"新电机ID 0x{new_id:02X} 已设置")
-        return response
+        self.send_command_nowait(command)
+        print(f"新电机ID {_hex2(new_id)} 已设置")
 
     def set_negative_limit(self, limit: int):
         """
         C8命令设置负限位
         命令: AA [ID] C8 00 [限位低8位] [限位高8位]
         """
-        # 将int16转换为无符号字节
-        if limit < 0:
-            limit_bytes = limit + 0x10000
-        else:
-            limit_bytes = limit
-
-        low_byte = limit_bytes & 0xFF
-        high_byte = (limit_bytes >> 8) & 0xFF
-
-        command = bytes([0xAA, self.motor_id, 0xC8, 0x00, low_byte, high_byte])
-        response = self.send_command(command)
+        command = _CMD_STRUCT.pack(0xAA, self.motor_id, 0xC8, 0x00, limit & 0xFFFF)
+        self.send_command_nowait(command)
         print(f"设置负限位: {limit}")
-        return response
 
     def set_positive_limit(self, limit: int):
         """
         C9命令设置正限位
         命令: AA [ID] C9 00 [限位低8位] [限位高8位]
         """
-        # 将int16转换为无符号字节
-        if limit < 0:
-            limit_bytes = limit + 0x10000
-        else:
-            limit_bytes = limit
-
-        low_byte = limit_bytes & 0xFF
-        high_byte = (limit_bytes >> 8) & 0xFF
-
-        command = bytes([0xAA, self.motor_id, 0xC9, 0x00, low_byte, high_byte])
-        response = self.send_command(command)
+        command = _CMD_STRUCT.pack(0xAA, self.motor_id, 0xC9, 0x00, limit & 0xFFFF)
+        self.send_command_nowait(command)
         print(f"设置正限位: {limit}")
-        return response
 
-    def measure_average_speed(self, duration: float = 8.0, frequency: float = 50.0) -> float:
+    def measure_speed_stats(self, duration: float = 8.0, frequency: float = 50.0) -> Tuple[float, float]:
         """
-        以指定频率读取电流数据并计算平均值
+        以指定频率读取速度数据
+        返回: (平均速度, 速度标准差)
         """
         interval = 1.0 / frequency
         total_readings = int(duration * frequency)
-        speeds = []
+        speeds = np.empty(total_readings, dtype=np.int16)
+        count = 0
 
-        print(f"开始采集电流数据，持续时间: {duration}秒，频率: {frequency}Hz")
+        _log("开始采集电流数据，持续时间: {}秒，频率: {}Hz", duration, frequency)
 
-        start_time = time.time()
-        for i in range(total_readings):
+        spin = interval < _SPIN_INTERVAL
+        deadline = time.perf_counter()
+        for _ in range(total_readings):
             _, speed, current = self.read_position_data()
-            speeds.append(speed)
+            speeds[count] = speed
+            count += 1
 
-            # 计算下一次读取的时间
-            elapsed = time.time() - start_time
-            next_read_time = (i + 1) * interval
-            sleep_time = next_read_time - elapsed
+            # 按绝对时间点排程，单次读取超时不会累积漂移
+            deadline += interval
+            _wait_until(deadline, spin)
 
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+        return _speed_stats(speeds[:count])
+
+    def measure_average_speed(self, duration: float = 8.0, frequency: float = 50.0) -> float:
+        """
+        以指定频率读取电流数据并计算平均值
+        """
+        return self.measure_speed_stats(duration, frequency)[0]
 
-        average_speed = sum(speeds) / len(speeds)
-        print(f"平均速度: {average_speed:.2f}, 采样点数: {len(speeds)}")
-        return average_speed
+    def measure_speed_stats_batched(self, duration: float = 8.0, frequency: float = 50.0,
+                                    batch: int = 8) -> Tuple[float, float]:
+        """
+        批量采集速度数据
+        一次写入batch条读取命令，再依次读回batch帧7字节应答，每批只休眠一次
+        任一帧不完整时退回逐条读取，并记住固件不支持批量
+        返回: (平均速度, 速度标准差)
+        """
+        if not self.batch_supported:
+            return self.measure_speed_stats(duration, frequency)
 
-    def find_zero_electrical_angle(self, initial_zero_pos: int = 0, max_iterations: int = 100) -> int:
+        interval = 1.0 / frequency
+        total_readings = int(duration * frequency)
+        speeds = np.empty(total_readings, dtype=np.int16)
+        command = self._cmd_read
+
+        _log("开始批量采集速度数据，持续时间: {}秒，频率: {}Hz，批大小: {}", duration, frequency, batch)
+
+        spin = interval < _SPIN_INTERVAL
+        count = 0
+        deadline = time.perf_counter()
+        while count < total_readings:
+            size = min(batch, total_readings - count)
+            self.ser.reset_input_buffer()
+            self._write_frame(command * size)
+            # 一次读回整批应答，串口传输期间不再逐帧往返
+            response = self.ser.read(7 * size)
+            for offset in range(0, 7 * size, 7):
+                if len(response) < offset + 7 or response[offset] != 0xAB:
+                    self.batch_supported = False
+                    break
+                _, speeds[count], _ = _POS_UNPACK(response, offset + 1)
+                count += 1
+            if not self.batch_supported:
+                _log("固件不支持批量读取，改为逐条读取")
+                # 以当前时刻重新计时，避免逐条读取时连续补读
+                deadline = time.perf_counter()
+                break
+
+            # 每批结束后统一等待到下一批的时间点
+            deadline += size * interval
+            _wait_until(deadline, spin)
+
+        while count < total_readings:
+            _, speeds[count], _ = self.read_position_data()
+            count += 1
+
+            deadline += interval
+            _wait_until(deadline, spin)
+
+        return _speed_stats(speeds[:count])
+
+    def wait_until_stable(self, timeout: float = 1.0, poll_interval: float = 0.05) -> bool:
+        """
+        轮询速度直到电机转速稳定，最长等待timeout秒
+        连续_STABLE_READINGS次读数的极差不超过_STABLE_TOLERANCE即认为稳定，返回是否在超时前稳定
+        首次读取前先等待一个轮询周期，让刚发出的C0命令在速度环中生效
+        """
+        deadline = time.perf_counter() + timeout
+        readings = collections.deque(maxlen=_STABLE_READINGS)
+        time.sleep(poll_interval)
+        while time.perf_counter() < deadline:
+            _, speed, _ = self.read_position_data()
+            if abs(speed) <= _STOP_SPEED:
+                readings.clear()
+            else:
+                readings.append(speed)
+                if len(readings) == _STABLE_READINGS and max(readings) - min(readings) <= _STABLE_TOLERANCE:
+                    return True
+            time.sleep(poll_interval)
+        return False
+
+    def wait_until_stopped(self, timeout: float = 1.0, poll_interval: float = 0.05) -> bool:
+        """
+        轮询速度直到电机停止，最长等待timeout秒
+        首次读取前先等待一个轮询周期，让刚发出的停止命令生效
+        返回是否在超时前停止
+        """
+        deadline = time.perf_counter() + timeout
+        time.sleep(poll_interval)
+        while time.perf_counter() < deadline:
+            _, speed, _ = self.read_position_data()
+            if abs(speed) <= _STOP_SPEED:
+                return True
+            time.sleep(poll_interval)
+        return False
+
+    def wait_phase(self, phase: str) -> bool:
+        """
+        按PHASE_WAITS中的阶段等待，spinup/stop阶段轮询速度并提前结束
+        返回是否在超时前满足判据，无判据的阶段固定等待后返回True
+        """
+        timeout = PHASE_WAITS[phase]
+        if phase == 'spinup':
+            return self.wait_until_stable(timeout)
+        if phase == 'stop':
+            return self.wait_until_stopped(timeout)
+        time.sleep(timeout)
+        return True
+
+    def find_zero_electrical_angle(self, initial_zero_pos: int = 0, max_iterations: int = 100,
+                                   max_speed_std: float = 10.0) -> int:
         """
         自动寻找0电角度位置
+        max_speed_std: 正反转速度标准差均低于该值时才接受收敛结果，避免噪声导致误判
         """
         print("开始自动寻找0电角度位置...")
 
-        last_current_difference = float('inf')
-
+        # 速度差值为正/负时的0电角度位置，两侧都出现后改为二分查找
+        positive_side = None
+        negative_side = None
+        best_position = self.current_zero_position
+        best_difference = float('inf')
+        velocity = 0.0
 
         for iteration in range(max_iterations):
+            _flush_log()
             print(f"\n--- 第 {iteration + 1} 次迭代 ---")
             print(f"当前0电角度位置: {self.current_zero_position}")
 
             # 清除电机状态
             self.stop_motor()
-            time.sleep(0.1)
+            self.wait_phase('stop')
 
             # 正转测试
-            print("正转测试...")
+            _log("正转测试...")
             self.set_motor_speed(25000)
-            time.sleep(1)  # 等待电机稳定
-            forward_speed = self.measure_average_speed(1.0, 100.0)
+            self.wait_phase('spinup')  # 等待电机稳定
+            forward_speed, forward_std = self.measure_speed_stats(1.0, 100.0)
             self.stop_motor()
-            time.sleep(1)  # 等待电机停止
+            self.wait_phase('stop')  # 等待电机停止
 
             # 反转测试
-            print("反转测试...")
+            _log("反转测试...")
             self.set_motor_speed(-25000)
-            time.sleep(1)  # 等待电机稳定
-            reverse_speed = self.measure_average_speed(1.0, 100.0)
+            self.wait_phase('spinup')  # 等待电机稳定
+            reverse_speed, reverse_std = self.measure_speed_stats(1.0, 100.0)
             self.stop_motor()
-            time.sleep(1)  # 等待电机停止
+            self.wait_phase('stop')  # 等待电机停止
 
             # 如果正转或者反转速度为0，出现错误，用户选择跳过本次或者退出
             if forward_speed == 0 or reverse_speed == 0:
+                _flush_log()
                 print("正转或反转速度为0，请检查电机状态")
                 user_input = input("是否跳过本次寻找?(Y/N): ").strip().lower()
                 if user_input == "y":
@@ -255,37 +508,52 @@ class MotorController:
 
             # 计算电流差值
             current_difference = abs(forward_speed) - abs(reverse_speed)
-            print(f"正转速度: {forward_speed:.2f}, 反转速度: {reverse_speed:.2f}, 差值: {current_difference:.2f}")
+            _log("正转速度: {:.2f}, 反转速度: {:.2f}, 差值: {:.2f}", forward_speed, reverse_speed, current_difference)
 
             # 判断是否满足条件
-            if abs(current_difference) <= 5:
+            if abs(current_difference) <= 5 and max(forward_std, reverse_std) < max_speed_std:
+                _flush_log()
                 print(f"\n找到0电角度位置: {self.current_zero_position}")
                 print(f"最终速度差值: {current_difference:.2f}")
                 return self.current_zero_position
 
-            delta = 2
-            # 调整0电角度位置
-            if abs(current_difference) > 50:
-                delta = 20
-            elif abs(current_difference) > 30:
-                delta = 15
-            elif abs(current_difference) > 25:
-                delta = 10
-            elif abs(current_difference) > 15:
-                delta = 5
+            if abs(current_difference) < best_difference:
+                best_position = self.current_zero_position
+                best_difference = abs(current_difference)
             if current_difference > 0:
-                # 正转电流大
-                self.current_zero_position += delta
-                print("正转速度较大，0电角度位置调整：" ,  delta)
+                positive_side = self.current_zero_position
             else:
-                # 反转电流大
-                self.current_zero_position -= delta
-                print("反转速度较大，0电角度位置调整：" ,  delta)
+                negative_side = self.current_zero_position
+
+            if positive_side is not None and negative_side is not None:
+                # 差值已变号，0电角度位于两侧位置之间，二分缩小区间
+                if abs(positive_side - negative_side) <= 1:
+                    _flush_log()
+                    print(f"\n二分区间已收敛，0电角度位置: {best_position}")
+                    print(f"最终速度差值: {best_difference:.2f}")
+                    self.set_zero_position(best_position)
+                    return best_position
+                self.current_zero_position = (positive_side + negative_side) // 2
+                _log("二分查找区间: [{}, {}]", positive_side, negative_side)
+            else:
+                # 按差值比例调整0电角度位置，动量项加速穿过差值变化平缓的区域
+                velocity = _STEP_MOMENTUM * velocity + _STEP_GAIN * current_difference
+                velocity = max(-_STEP_MAX, min(_STEP_MAX, velocity))
+                delta = max(1, int(round(abs(velocity))))
+                if velocity > 0:
+                    # 正转电流大
+                    self.current_zero_position += delta
+                    _log("正转速度较大，0电角度位置调整：{}", delta)
+                else:
+                    # 反转电流大
+                    self.current_zero_position -= delta
+                    _log("反转速度较大，0电角度位置调整：{}", delta)
 
             # 设置新的0电角度位置
             self.set_zero_position(self.current_zero_position)
-            time.sleep(0.1)
+            self.wait_phase('iteration')
 
+        _flush_log()
         print(f"达到最大迭代次数 {max_iterations}，未找到精确的0电角度位置")
         return self.current_zero_position
 
@@ -293,15 +561,36 @@ class MotorController:
         """
         关闭串口连接
         """
+        _flush_log()
         self.ser.close()
 
 
+def _baudrate_arg(value: str):
+    """
+    解析--baudrate参数: auto或BAUDRATE_CANDIDATES中的波特率
+    """
+    if value == "auto":
+        return value
+    try:
+        baudrate = int(value)
+    except ValueError:
+        baudrate = None
+    if baudrate not in BAUDRATE_CANDIDATES:
+        choices = ", ".join(str(b) for b in BAUDRATE_CANDIDATES)
+        raise argparse.ArgumentTypeError(f"波特率必须为auto或 {choices} 之一: {value}")
+    return baudrate
+
+
 def main():
     # 使用示例
     # 请根据实际情况修改串口号
-    port = "COM16"  # Windows
-    # port = "/dev/ttyUSB0"  # Linux
-    # port = "/dev/tty.usbserial"  # macOS
+    # Windows: COM16, Linux: /dev/ttyUSB0, macOS: /dev/tty.usbserial
+    parser = argparse.ArgumentParser(description="电机标定程序")
+    parser.add_argument("--port", default="COM16", help="串口号")
+    parser.add_argument("--baudrate", type=_baudrate_arg, default=115200,
+                        help="串口波特率，auto为从921600向下自动探测 (需固件同步提高波特率)")
+    args = parser.parse_args()
+    port = args.port
 
     try:
         # 第一步：获取初始电机ID
@@ -317,46 +606,53 @@ def main():
             return
 
         # 初始化电机控制器
-        motor = MotorController(port)
-        motor.set_motor_id(initial_id)
-        print(f"已连接电机，当前ID: 0x{initial_id:02X}")
+        if args.baudrate == "auto":
+            motor = MotorController(port, BAUDRATE_CANDIDATES[-1])
+            motor.set_motor_id(initial_id)
+            motor.probe_baudrate()
+        else:
+            motor = MotorController(port, args.baudrate)
+            motor.set_motor_id(initial_id)
+        print(f"已连接电机，当前ID: {_hex2(initial_id)}")
 
         # 第二步：设置粗0位
         print("\n第二步：设置粗0位")
         motor.send_command(bytes([0xAA, motor.motor_id, 0xF2, 0x00, 0x00, 0x00]))
         motor.set_coarse_zero_position()
         motor.set_motor_speed(10000)
-        time.sleep(1)
+        motor.wait_phase('spinup')
         speed = motor.measure_average_speed(2.0, 35.0);
         motor.stop_motor()
         # 读取当前位置
         position, speed, current = motor.read_position_data()
+        _flush_log()
         print(f"当前位置: {position}, 速度: {speed}, 电流: {current}")
-        time.sleep(2)
+        motor.wait_phase('stop')
         # 第三步：自动寻找0电角度
         print("\n第三步：自动寻找0电角度")
         final_zero_pos = motor.find_zero_electrical_angle(initial_zero_pos=position)
 
+        _flush_log()
         print(f"\n最终0电角度位置: {final_zero_pos}")
 
         # 验证最终结果
         print("\n验证最终结果...")
-        motor.clear_motor_status()
 
         # 正转测试
         motor.set_motor_speed(25000)
-        time.sleep(2)
+        motor.wait_phase('spinup')
         forward_current = motor.measure_average_speed(2.0, 30.0)
         motor.stop_motor()
-        time.sleep(2)
+        motor.wait_phase('stop')
 
         # 反转测试
         motor.set_motor_speed(-25000)
-        time.sleep(2)
+        motor.wait_phase('spinup')
         reverse_current = motor.measure_average_speed(2.0, 30.0)
         motor.stop_motor()
 
         final_difference = abs(forward_current) - abs(reverse_current)
+        _flush_log()
         print(
             f"最终验证 - 正转: {forward_current:.2f}, 反转: {reverse_current:.2f}, 差值: {final_difference:.2f}")
 
@@ -397,15 +693,21 @@ def main():
         motor.save_conf()
 
         print("\n✓ 标定和配置完成！")
-        print(f"电机ID: 0x{new_id:02X}")
+        print(f"电机ID: {_hex2(new_id)}")
         print(f"负限位: {negative_limit}")
         print(f"正限位: {positive_limit}")
         print(f"0电角度位置: {final_zero_pos}")
 
     except Exception as e:
+        _flush_log()
         print(f"发生错误: {e}")
     finally:
         if 'motor' in locals():
+            # 读取失败等异常可能发生在电机运转中，退出前尽量停机
+            try:
+                motor.stop_motor()
+            except Exception:
+                pass
             motor.close()
 
 
@@ -2,8 +2,12 @@ import tkinter as tk
 from tkinter import ttk
 import serial
 import threading
+import queue
 import time
 
+# 相邻两帧之间的最小空闲时间，固件按串口空闲断帧，连续发送的帧只执行第一帧
+FRAME_GAP = 0.002
+
 
 class MotorControlGUI:
     def __init__(self, root):
@@ -17,13 +21,20 @@ class MotorControlGUI:
         self.baudrate = 115200
         self.motor_id = 0x01
 
+        # 单个后台线程按顺序发送全部命令，位置命令只保留最新一条
+        # 位置命令以单元素列表入队，未发出前可原地替换为更新的位置
+        self._cmd_q = queue.Queue()
+        self._position_box = None
+        self._position_lock = threading.Lock()
+        threading.Thread(target=self._command_worker, daemon=True).start()
+
         self.setup_serial()
         self.create_widgets()
 
     def setup_serial(self):
         """初始化串口连接"""
         try:
-            self.ser = serial.Serial(self.port, self.baudrate, timeout=1)
+            self.ser = serial.Serial(self.port, self.baudrate, timeout=1, write_timeout=0.1)
             print(f"串口 {self.port} 连接成功")
         except Exception as e:
             print(f"串口连接失败: {e}")
@@ -32,6 +43,7 @@ class MotorControlGUI:
         """发送命令"""
         if self.ser and self.ser.is_open:
             self.ser.write(command)
+            self.ser.flush()
 
     def create_widgets(self):
         """创建界面控件"""
@@ -115,8 +127,13 @@ class MotorControlGUI:
         # C2命令: AA [ID] C2 00 [位置低8位] [位置高8位]
         command = bytes([0xAA, self.motor_id, 0xC2, 0x00, low_byte, high_byte])
 
-        # 在新线程中发送命令
-        threading.Thread(target=self._send_command, args=(command,), daemon=True).start()
+        # 交给发送线程，未发出的旧位置直接被新位置替换
+        with self._position_lock:
+            if self._position_box is not None:
+                self._position_box[0] = command
+            else:
+                self._position_box = [command]
+                self._cmd_q.put(self._position_box)
 
         self.status_var.set(f"位置: {position}")
 
@@ -125,7 +142,10 @@ class MotorControlGUI:
         # C7命令: AA [ID] C7 00 00 00
         command = bytes([0xAA, self.motor_id, 0xC7, 0x00, 0x00, 0x00])
 
-        threading.Thread(target=self._send_command, args=(command,), daemon=True).start()
+        # 封存排在C7之前的位置命令，之后的滑块位置另行排在C7之后
+        with self._position_lock:
+            self._position_box = None
+            self._cmd_q.put(command)
 
         # 重置滑块到0
         self.slider_var.set(0)
@@ -133,12 +153,25 @@ class MotorControlGUI:
 
         self.status_var.set("重新设零")
 
+    def _command_worker(self):
+        """后台线程: 依次发送队列中的命令，列表项为可被替换的位置命令"""
+        while True:
+            command = self._cmd_q.get()
+            if isinstance(command, list):
+                with self._position_lock:
+                    if self._position_box is command:
+                        self._position_box = None
+                    command = command[0]
+            self._send_command(command)
+            time.sleep(FRAME_GAP)
+
     def _send_command(self, command):
-        """在新线程中发送命令"""
+        """在发送线程中发送命令，失败时更新状态栏"""
         try:
             self.send_command(command)
         except Exception as e:
-            self.root.after(0, lambda: self.status_var.set(f"发送失败: {e}"))
+            message = f"发送失败: {e}"
+            self.root.after(0, lambda: self.status_var.set(message))
 
     def on_closing(self):
         """关闭窗口时的清理工作"""